@@ -26,6 +26,9 @@ def login():
         "image": "base64_encoded_image_data"
     }
     
+    Alternatively, the image can be uploaded as raw bytes in a
+    multipart/form-data request with an "image" file.
+    
     Returns:
         JSON: JWT tokens and user information.
     """
@@ -33,18 +36,23 @@ def login():
     
     try:
         # Get request data
-        data = request.get_json()
-        
-        if not data or not data.get('image'):
+        uploaded_image = request.files.get('image')
+        if request.mimetype == 'multipart/form-data':
+            image_data = uploaded_image.read() if uploaded_image is not None else None
+        else:
+            data = request.get_json()
+            image_data = data.get('image') if data else None
+        
+        if not image_data:
             return jsonify({
                 "status": "error",
                 "message": "Image data is required",
                 "data": None
             }), 400
         
-        # Decode base64 image
+        # Decode image (uploaded files are already raw bytes, JSON images are base64)
         try:
-            image_bytes = base64.b64decode(data['image'])
+            image_bytes = image_data if uploaded_image is not None else base64.b64decode(image_data)
             nparr = np.frombuffer(image_bytes, np.uint8)
             image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
             
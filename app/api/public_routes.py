@@ -27,6 +27,9 @@ def register_user_with_face():
         "image": "base64_encoded_image_data"
     }
     
+    Alternatively, the image can be uploaded as raw bytes in a
+    multipart/form-data request with an "image" file and "name" and "email" fields.
+    
     Returns:
         JSON: User information and JWT tokens for immediate login.
     """
@@ -34,7 +37,13 @@ def register_user_with_face():
     
     try:
         # Get and validate request data
-        data = request.get_json()
+        uploaded_image = request.files.get('image')
+        if request.mimetype == 'multipart/form-data':
+            data = request.form.to_dict()
+            if uploaded_image is not None:
+                data['image'] = uploaded_image.read()
+        else:
+            data = request.get_json()
         is_valid, missing_fields = validate_request_data(data, ['name', 'email', 'image'])
         
         if not is_valid:
@@ -55,9 +64,9 @@ def register_user_with_face():
         if existing_user:
             return create_error_response("User with this email already exists", 409)
         
-        # Decode and validate image
+        # Decode and validate image (uploaded files are already raw bytes, JSON images are base64)
         try:
-            image_bytes = base64.b64decode(image_data)
+            image_bytes = image_data if uploaded_image is not None else base64.b64decode(image_data)
             nparr = np.frombuffer(image_bytes, np.uint8)
             image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
             
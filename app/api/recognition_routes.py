@@ -30,6 +30,9 @@ def register_face_endpoint():
         "image": "base64_encoded_image_data"
     }
     
+    Alternatively, the image can be uploaded as raw bytes in a
+    multipart/form-data request with an "image" file and a "user_id" field.
+    
     Returns:
         JSON: Registration result.
     """
@@ -37,17 +40,22 @@ def register_face_endpoint():
     
     try:
         # Get request data
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                "status": "error",
-                "message": "No data provided",
-                "data": None
-            }), 400
-        
-        user_id = data.get('user_id')
-        image_data = data.get('image')
+        uploaded_image = request.files.get('image')
+        if request.mimetype == 'multipart/form-data':
+            user_id = request.form.get('user_id', type=int)
+            image_data = uploaded_image.read() if uploaded_image is not None else None
+        else:
+            data = request.get_json()
+            
+            if not data:
+                return jsonify({
+                    "status": "error",
+                    "message": "No data provided",
+                    "data": None
+                }), 400
+            
+            user_id = data.get('user_id')
+            image_data = data.get('image')
         
         # Validate required fields
         if not user_id or not image_data:
@@ -76,9 +84,9 @@ def register_face_endpoint():
                 "data": None
             }), 404
         
-        # Decode base64 image
+        # Decode image (uploaded files are already raw bytes, JSON images are base64)
         try:
-            image_bytes = base64.b64decode(image_data)
+            image_bytes = image_data if uploaded_image is not None else base64.b64decode(image_data)
             # Convert bytes to numpy array
             nparr = np.frombuffer(image_bytes, np.uint8)
             # Decode image
@@ -141,6 +149,9 @@ def authenticate_face_endpoint():
         "image": "base64_encoded_image_data"
     }
     
+    Alternatively, the image can be uploaded as raw bytes in a
+    multipart/form-data request with an "image" file.
+    
     Returns:
         JSON: Authentication result.
     """
@@ -148,16 +159,20 @@ def authenticate_face_endpoint():
     
     try:
         # Get request data
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                "status": "error",
-                "message": "No data provided",
-                "data": None
-            }), 400
-        
-        image_data = data.get('image')
+        uploaded_image = request.files.get('image')
+        if request.mimetype == 'multipart/form-data':
+            image_data = uploaded_image.read() if uploaded_image is not None else None
+        else:
+            data = request.get_json()
+            
+            if not data:
+                return jsonify({
+                    "status": "error",
+                    "message": "No data provided",
+                    "data": None
+                }), 400
+            
+            image_data = data.get('image')
         
         # Validate required fields
         if not image_data:
@@ -167,9 +182,9 @@ def authenticate_face_endpoint():
                 "data": None
             }), 400
         
-        # Decode base64 image
+        # Decode image (uploaded files are already raw bytes, JSON images are base64)
         try:
-            image_bytes = base64.b64decode(image_data)
+            image_bytes = image_data if uploaded_image is not None else base64.b64decode(image_data)
             # Convert bytes to numpy array
             nparr = np.frombuffer(image_bytes, np.uint8)
             # Decode image
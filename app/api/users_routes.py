@@ -6,6 +6,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.api import users_bp
 from app.database.models import User
 from app.services.auth import AuthService
+from app.services.face_recognition import invalidate_encoding_cache
 from app.utils import create_error_response, create_success_response, validate_request_data
 import logging
 
@@ -276,8 +277,9 @@ def delete_user(user_id):
                 "data": None
             }), 404
         
-        # Delete the user
+        # Delete the user (face encodings are removed by cascade)
         if user.delete():
+            invalidate_encoding_cache()
             return jsonify({
                 "status": "success",
                 "message": f"User with ID {user_id} deleted successfully",
@@ -16,6 +16,7 @@ DATABASE = {
 FACE_RECOGNITION = {
     'threshold': float(os.environ.get('FACE_RECOGNITION_THRESHOLD', 0.6)),
     'max_faces_per_user': int(os.environ.get('MAX_FACES_PER_USER', 5)),
+    'use_gpu': os.environ.get('FACE_USE_GPU', '0') == '1',
 }
 
 # Storage settings
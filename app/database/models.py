@@ -4,12 +4,44 @@ Database models for the Face Login application.
 import sqlite3
 import logging
 import json
+import numpy as np
 from datetime import datetime
 from app.database.db import get_db_connection
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+def _serialize_encoding(encoding):
+    """
+    Serialize a face encoding to the raw bytes stored in the database.
+    
+    Args:
+        encoding (numpy.ndarray or list): Face encoding data.
+        
+    Returns:
+        bytes: The encoding as contiguous float32 bytes.
+    """
+    if encoding is None:
+        encoding = []
+    return np.ascontiguousarray(encoding, dtype=np.float32).tobytes()
+
+def _deserialize_encoding(blob):
+    """
+    Deserialize a face encoding stored in the database.
+    
+    Encodings are stored as raw float32 bytes. Rows written by older versions
+    stored a JSON list instead, which is still accepted.
+    
+    Args:
+        blob (bytes or str): The stored encoding.
+        
+    Returns:
+        numpy.ndarray: The face encoding as a float32 array.
+    """
+    if isinstance(blob, str):
+        return np.asarray(json.loads(blob), dtype=np.float32)
+    return np.frombuffer(blob, dtype=np.float32)
+
 class User:
     """
     User model for managing user data in the database.
@@ -273,7 +305,7 @@ class FaceEncoding:
         
         Args:
             user_id (int): User ID.
-            encoding (numpy.ndarray): Face encoding data.
+            encoding (numpy.ndarray or list): Face encoding data.
             image_path (str): Path to the face image.
             
         Returns:
@@ -286,9 +318,8 @@ class FaceEncoding:
             conn = get_db_connection()
             cursor = conn.cursor()
             
-            # For testing purposes, we'll store the encoding as a JSON string
-            # In the real implementation, this would be a numpy array serialized with pickle
-            encoding_blob = json.dumps(encoding if encoding else [])
+            # Store the encoding as raw float32 bytes
+            encoding_blob = _serialize_encoding(encoding)
             
             cursor.execute(
                 "INSERT INTO face_encodings (user_id, encoding, image_path) VALUES (?, ?, ?)",
@@ -305,9 +336,7 @@ class FaceEncoding:
             conn.close()
             
             if encoding_data:
-                # For testing purposes, we'll parse the JSON string
-                # In the real implementation, this would be a numpy array deserialized with pickle
-                encoding_array = json.loads(encoding_data['encoding'])
+                encoding_array = _deserialize_encoding(encoding_data['encoding'])
                 
                 return cls(
                     id=encoding_data['id'],
@@ -347,7 +376,7 @@ class FaceEncoding:
                 cls(
                     id=encoding_data['id'],
                     user_id=encoding_data['user_id'],
-                    encoding=json.loads(encoding_data['encoding']),
+                    encoding=_deserialize_encoding(encoding_data['encoding']),
                     image_path=encoding_data['image_path'],
                     created_at=encoding_data['created_at']
                 )
@@ -359,6 +388,42 @@ class FaceEncoding:
                 conn.close()
             return []
     
+    @classmethod
+    def get_all(cls):
+        """
+        Get all face encodings that belong to an existing user.
+        
+        Returns:
+            list: A list of FaceEncoding objects.
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            
+            cursor.execute(
+                "SELECT face_encodings.* FROM face_encodings "
+                "JOIN users ON users.id = face_encodings.user_id "
+                "ORDER BY face_encodings.user_id, face_encodings.id"
+            )
+            encodings_data = cursor.fetchall()
+            conn.close()
+            
+            return [
+                cls(
+                    id=encoding_data['id'],
+                    user_id=encoding_data['user_id'],
+                    encoding=_deserialize_encoding(encoding_data['encoding']),
+                    image_path=encoding_data['image_path'],
+                    created_at=encoding_data['created_at']
+                )
+                for encoding_data in encodings_data
+            ]
+        except sqlite3.Error as e:
+            logger.error(f"Error getting all face encodings: {e}")
+            if conn:
+                conn.close()
+            return []
+    
     @classmethod
     def count_by_user_id(cls, user_id):
         """
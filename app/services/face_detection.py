@@ -7,11 +7,19 @@ validating face images, and extracting face encodings.
 import logging
 import cv2
 import numpy as np
+import dlib
 import face_recognition
 
+from app.config import FACE_RECOGNITION
+
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Use dlib's CNN detector when GPU use is requested and dlib was built with CUDA.
+# The HOG detector stays the default since the CNN model is very slow on CPU.
+USE_GPU = FACE_RECOGNITION['use_gpu'] and getattr(dlib, 'DLIB_USE_CUDA', False)
+_FACE_LOCATION_KWARGS = {'model': 'cnn'} if USE_GPU else {}
+
 class FaceDetectionError(Exception):
     """Exception raised when no faces are detected in an image."""
     pass
@@ -49,7 +57,7 @@ def detect_faces(image):
         rgb_image = image
     
     # Detect faces using face_recognition library
-    face_locations = face_recognition.face_locations(rgb_image)
+    face_locations = face_recognition.face_locations(rgb_image, **_FACE_LOCATION_KWARGS)
     
     if not face_locations:
         logger.warning("No faces detected in the image")
@@ -84,24 +92,19 @@ def detect_single_face(image):
     # Return the single face location
     return face_locations[0]
 
-def validate_face_image(image):
+def check_image_quality(image):
     """
-    Validate if a face image is suitable for registration or authentication.
+    Check the image size and brightness, without running face detection.
+    
+    These are the checks validate_face_image runs before detecting faces.
     
     Args:
         image (numpy.ndarray): OpenCV format image data
         
     Returns:
-        tuple: (is_valid, message) where is_valid is a boolean indicating if the image is valid,
-               and message is a string explaining the validation result
-        
-    Raises:
-        ValueError: If the image data is invalid
+        tuple: (is_valid, message) where is_valid is a boolean indicating if the image passed the checks,
+               and message is a string explaining the result
     """
-    if image is None or not isinstance(image, np.ndarray):
-        logger.error("Invalid image data provided")
-        raise ValueError("Invalid image data provided")
-    
     # Check image size
     if image.shape[0] < 100 or image.shape[1] < 100:
         logger.warning("Image is too small")
@@ -110,12 +113,11 @@ def validate_face_image(image):
     # Check image brightness
     if len(image.shape) == 3 and image.shape[2] == 3:
         # Convert to grayscale if it's a color image
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        gray = cv2.cvtColor(gray, cv2.COLOR_RGB2GRAY)
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     else:
         gray = image
     
-    brightness = np.mean(gray)
+    brightness = cv2.mean(gray)[0]
     if brightness < 50:
         logger.warning(f"Image is too dark (brightness: {brightness:.2f})")
         return False, f"Image is too dark (brightness: {brightness:.2f})"
@@ -123,6 +125,31 @@ def validate_face_image(image):
         logger.warning(f"Image is too bright (brightness: {brightness:.2f})")
         return False, f"Image is too bright (brightness: {brightness:.2f})"
     
+    return True, "Image quality is acceptable"
+
+def validate_face_image(image):
+    """
+    Validate if a face image is suitable for registration or authentication.
+    
+    Args:
+        image (numpy.ndarray): OpenCV format image data
+        
+    Returns:
+        tuple: (is_valid, message) where is_valid is a boolean indicating if the image is valid,
+               and message is a string explaining the validation result
+        
+    Raises:
+        ValueError: If the image data is invalid
+    """
+    if image is None or not isinstance(image, np.ndarray):
+        logger.error("Invalid image data provided")
+        raise ValueError("Invalid image data provided")
+    
+    # Check image size and brightness
+    is_valid, message = check_image_quality(image)
+    if not is_valid:
+        return False, message
+    
     # Check for face detection
     try:
         face_locations = detect_faces(image)
@@ -196,7 +223,7 @@ def extract_face_encoding(image):
         rgb_image = image
     
     # Detect face location
-    face_locations = face_recognition.face_locations(rgb_image)
+    face_locations = face_recognition.face_locations(rgb_image, **_FACE_LOCATION_KWARGS)
     
     # Extract face encoding
     face_encodings = face_recognition.face_encodings(rgb_image, face_locations)
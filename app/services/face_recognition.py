@@ -6,6 +6,7 @@ retrieving user encodings, comparing faces, and authenticating users.
 """
 import logging
 import os
+import threading
 import uuid
 import cv2
 import numpy as np
@@ -18,6 +19,13 @@ from app.services.face_detection import extract_face_encoding, FaceDetectionErro
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# In-memory cache of all known encodings, rebuilt lazily after invalidation
+_ENCODING_CACHE = {
+    'encodings': None,
+    'user_ids': None,
+}
+_ENCODING_CACHE_LOCK = threading.Lock()
+
 def get_user_encodings(user_id):
     """
     Get all face encodings for a specific user.
@@ -54,6 +62,48 @@ def get_user_encodings(user_id):
     logger.info(f"Retrieved {len(encodings)} face encodings for user ID: {user_id}")
     return encodings
 
+def get_known_encodings():
+    """
+    Get the face encodings of all users as a single matrix.
+    
+    The result is cached in memory and only reloaded from the database
+    after invalidate_encoding_cache() has been called.
+    
+    Returns:
+        tuple: (encodings, user_ids)
+            - encodings (numpy.ndarray): (N, 128) float32 array of face encodings.
+            - user_ids (numpy.ndarray): int64 array with the owner of each row.
+    """
+    with _ENCODING_CACHE_LOCK:
+        if _ENCODING_CACHE['encodings'] is None:
+            face_encoding_objects = [
+                obj for obj in FaceEncoding.get_all()
+                if obj.encoding is not None and len(obj.encoding) > 0
+            ]
+            
+            if face_encoding_objects:
+                encodings = np.vstack([obj.encoding for obj in face_encoding_objects]).astype(np.float32, copy=False)
+            else:
+                encodings = np.empty((0, 128), dtype=np.float32)
+            user_ids = np.asarray([obj.user_id for obj in face_encoding_objects], dtype=np.int64)
+            
+            _ENCODING_CACHE['encodings'] = encodings
+            _ENCODING_CACHE['user_ids'] = user_ids
+            logger.info(f"Loaded {len(encodings)} face encodings into the cache")
+        
+        return _ENCODING_CACHE['encodings'], _ENCODING_CACHE['user_ids']
+
+def invalidate_encoding_cache():
+    """
+    Invalidate the in-memory cache used by get_known_encodings().
+    
+    Must be called whenever face encodings are added or removed.
+    """
+    with _ENCODING_CACHE_LOCK:
+        _ENCODING_CACHE['encodings'] = None
+        _ENCODING_CACHE['user_ids'] = None
+    logger.debug("Face encoding cache invalidated")
+
 def get_recognition_threshold():
     """
     Get the current face recognition threshold value.
@@ -193,7 +243,8 @@ def register_face(user_id, image):
     
     # Save the face encoding to the database
     try:
-        face_encoding_obj = FaceEncoding.create(user_id, face_encoding.tolist(), image_path)
+        face_encoding_obj = FaceEncoding.create(user_id, np.ascontiguousarray(face_encoding, dtype=np.float32), image_path)
+        invalidate_encoding_cache()
         logger.info(f"Face encoding registered for user {user_id}")
         return face_encoding_obj
     except Exception as e:
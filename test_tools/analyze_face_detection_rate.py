@@ -13,18 +13,27 @@ from tabulate import tabulate
 
 # Define paths
 RESULTS_DIR = 'tests/results'
-RESULTS_FILE = os.path.join(RESULTS_DIR, 'face_detection_test_results.csv')
+# The test writes Parquet when a Parquet engine is installed, otherwise CSV
+RESULTS_FILE = os.path.join(RESULTS_DIR, 'face_detection_test_results.parquet')
+RESULTS_CSV_FILE = os.path.join(RESULTS_DIR, 'face_detection_test_results.csv')
 SUMMARY_FILE = os.path.join(RESULTS_DIR, 'face_detection_test_summary.csv')
 OUTPUT_DIR = os.path.join(RESULTS_DIR, 'analysis')
 
 def load_results():
-    """Load test results from CSV file."""
-    if not os.path.exists(RESULTS_FILE):
-        print(f"Error: Results file not found at {RESULTS_FILE}")
+    """Load test results from the Parquet file, or from the CSV file if there is no Parquet file."""
+    if os.path.exists(RESULTS_FILE):
+        results_path = RESULTS_FILE
+    elif os.path.exists(RESULTS_CSV_FILE):
+        results_path = RESULTS_CSV_FILE
+    else:
+        print(f"Error: Results file not found at {RESULTS_FILE} or {RESULTS_CSV_FILE}")
         return None
     
     try:
-        df = pd.read_csv(RESULTS_FILE)
+        if results_path.endswith('.parquet'):
+            df = pd.read_parquet(results_path)
+        else:
+            df = pd.read_csv(results_path)
         print(f"Loaded {len(df)} test results")
         return df
     except Exception as e:
@@ -250,7 +259,9 @@ def analyze_validation_rate(df):
     # Count by reason
     reason_counts = reason_df['reason'].value_counts().reset_index()
     reason_counts.columns = ['Reason', 'Count']
-    reason_counts['Percentage'] = reason_counts['Count'] / len(failure_reasons) * 100
+    # Fused divide/multiply (uses numexpr when it is installed)
+    n = len(failure_reasons)
+    reason_counts.eval('Percentage = Count / @n * 100', inplace=True)
     
     print(tabulate(reason_counts, headers='keys', tablefmt='grid'))
     
@@ -38,8 +38,8 @@ def change_background(image, face_location, background):
     # 顔のマスクを作成
     mask = extract_face_mask(image, face_location)
     
-    # マスクを3チャンネルに拡張
-    mask_3channel = cv2.merge([mask, mask, mask])
+    # マスクをチャンネル方向にブロードキャスト（cv2.mergeによるコピーを作らない）
+    mask_3channel = mask[:, :, np.newaxis]
     
     # 背景と元の画像を合成
     result = np.where(mask_3channel > 0, image, background).astype(np.uint8)
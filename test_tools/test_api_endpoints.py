@@ -2,13 +2,15 @@
 Test script for API endpoints.
 """
 import requests
-import base64
 import json
 from pathlib import Path
 
 # Base URL for the API
 BASE_URL = "http://localhost:5001/api"
 
+# Shared session so all calls reuse the same keep-alive connection
+SESSION = requests.Session()
+
 def test_user_endpoints():
     """Test user management endpoints."""
     print("\n=== Testing User Management Endpoints ===")
@@ -19,7 +21,7 @@ def test_user_endpoints():
         "name": "Test User",
         "email": "test@example.com"
     }
-    response = requests.post(f"{BASE_URL}/users", json=user_data)
+    response = SESSION.post(f"{BASE_URL}/users", json=user_data)
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
     
@@ -29,13 +31,13 @@ def test_user_endpoints():
         
         # Test getting all users
         print("\n2. Getting all users...")
-        response = requests.get(f"{BASE_URL}/users")
+        response = SESSION.get(f"{BASE_URL}/users")
         print(f"Status: {response.status_code}")
         print(f"Response: {json.dumps(response.json(), indent=2)}")
         
         # Test getting a specific user
         print(f"\n3. Getting user with ID {user_id}...")
-        response = requests.get(f"{BASE_URL}/users/{user_id}")
+        response = SESSION.get(f"{BASE_URL}/users/{user_id}")
         print(f"Status: {response.status_code}")
         print(f"Response: {json.dumps(response.json(), indent=2)}")
         
@@ -44,7 +46,7 @@ def test_user_endpoints():
         update_data = {
             "name": "Updated Test User"
         }
-        response = requests.put(f"{BASE_URL}/users/{user_id}", json=update_data)
+        response = SESSION.put(f"{BASE_URL}/users/{user_id}", json=update_data)
         print(f"Status: {response.status_code}")
         print(f"Response: {json.dumps(response.json(), indent=2)}")
         
@@ -62,17 +64,14 @@ def test_face_registration(user_id):
         print(f"Test image not found at {test_image_path}")
         return False
     
-    # Read and encode the image
-    with open(test_image_path, "rb") as f:
-        image_data = base64.b64encode(f.read()).decode('utf-8')
-    
-    # Register the face
+    # Register the face (raw multipart upload, no base64 encoding needed)
     print(f"\nRegistering face for user ID {user_id}...")
-    registration_data = {
-        "user_id": user_id,
-        "image": image_data
-    }
-    response = requests.post(f"{BASE_URL}/recognition/register", json=registration_data)
+    with open(test_image_path, "rb") as f:
+        response = SESSION.post(
+            f"{BASE_URL}/recognition/register",
+            files={"image": f},
+            data={"user_id": user_id}
+        )
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
     
@@ -88,16 +87,10 @@ def test_face_authentication():
         print(f"Test image not found at {test_image_path}")
         return
     
-    # Read and encode the image
-    with open(test_image_path, "rb") as f:
-        image_data = base64.b64encode(f.read()).decode('utf-8')
-    
-    # Authenticate the face
+    # Authenticate the face (raw multipart upload, no base64 encoding needed)
     print("\nAuthenticating face...")
-    auth_data = {
-        "image": image_data
-    }
-    response = requests.post(f"{BASE_URL}/recognition/authenticate", json=auth_data)
+    with open(test_image_path, "rb") as f:
+        response = SESSION.post(f"{BASE_URL}/recognition/authenticate", files={"image": f})
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
 
@@ -107,14 +100,14 @@ def test_auth_history(user_id=None):
     
     # Test getting all history
     print("\n1. Getting all authentication history...")
-    response = requests.get(f"{BASE_URL}/recognition/history")
+    response = SESSION.get(f"{BASE_URL}/recognition/history")
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
     
     # Test getting user-specific history
     if user_id:
         print(f"\n2. Getting authentication history for user ID {user_id}...")
-        response = requests.get(f"{BASE_URL}/recognition/history", params={"user_id": user_id})
+        response = SESSION.get(f"{BASE_URL}/recognition/history", params={"user_id": user_id})
         print(f"Status: {response.status_code}")
         print(f"Response: {json.dumps(response.json(), indent=2)}")
 
@@ -124,7 +117,7 @@ def test_cleanup(user_id):
     
     if user_id:
         print(f"\nDeleting user with ID {user_id}...")
-        response = requests.delete(f"{BASE_URL}/users/{user_id}")
+        response = SESSION.delete(f"{BASE_URL}/users/{user_id}")
         print(f"Status: {response.status_code}")
         print(f"Response: {json.dumps(response.json(), indent=2)}")
 
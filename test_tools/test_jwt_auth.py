@@ -4,10 +4,26 @@ Test JWT authentication endpoints
 import requests
 import json
 import base64
+import mmap
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 BASE_URL = "http://localhost:5001/api"
 
+# Shared session so the sequential calls reuse the same keep-alive connection
+SESSION = requests.Session()
+
+def dump_json(data):
+    """Serialize a request body to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
+
 def test_auth_flow():
     """Test the complete authentication flow"""
     print("🔐 Testing JWT Authentication Flow")
@@ -22,13 +38,17 @@ def test_auth_flow():
         print("❌ Test image not found")
         return
     
+    # Encode straight from a memory map to avoid an intermediate copy of the file
     with open(test_image_path, "rb") as f:
-        image_base64 = base64.b64encode(f.read()).decode('utf-8')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            image_base64 = base64.b64encode(mm).decode('ascii')
     
     # Login request
-    login_response = requests.post(
+    # The large base64 payload is serialized with orjson when available
+    login_response = SESSION.post(
         f"{BASE_URL}/auth/login",
-        json={"image": image_base64}
+        data=dump_json({"image": image_base64}),
+        headers={"Content-Type": "application/json"}
     )
     
     print(f"Status: {login_response.status_code}")
@@ -46,25 +66,31 @@ def test_auth_flow():
     print(f"User: {login_data['data']['user']['name']}")
     print(f"Access token: {access_token[:20]}...")
     
+    # Steps 2-4 are independent read-only checks, so send them concurrently
+    # (plain requests.get, since a Session is not safe to share between threads)
+    headers = {"Authorization": f"Bearer {access_token}"}
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        me_future = executor.submit(requests.get, f"{BASE_URL}/auth/me", headers=headers)
+        users_future = executor.submit(requests.get, f"{BASE_URL}/users", headers=headers)
+        no_auth_future = executor.submit(requests.get, f"{BASE_URL}/auth/me")
+    
     # Step 2: Test authenticated endpoint
     print("\n2. Testing authenticated endpoint (get current user)...")
     
-    headers = {"Authorization": f"Bearer {access_token}"}
-    me_response = requests.get(f"{BASE_URL}/auth/me", headers=headers)
-    
+    me_response = me_future.result()
     print(f"Status: {me_response.status_code}")
     print(f"Response: {json.dumps(me_response.json(), indent=2)}")
     
     # Step 3: Test protected user endpoint
     print("\n3. Testing protected user endpoint...")
     
-    users_response = requests.get(f"{BASE_URL}/users", headers=headers)
+    users_response = users_future.result()
     print(f"Status: {users_response.status_code}")
     
     # Step 4: Test without token
     print("\n4. Testing endpoint without token...")
     
-    no_auth_response = requests.get(f"{BASE_URL}/auth/me")
+    no_auth_response = no_auth_future.result()
     print(f"Status: {no_auth_response.status_code}")
     print(f"Response: {json.dumps(no_auth_response.json(), indent=2)}")
     
@@ -72,7 +98,7 @@ def test_auth_flow():
     print("\n5. Testing token refresh...")
     
     refresh_headers = {"Authorization": f"Bearer {refresh_token}"}
-    refresh_response = requests.post(f"{BASE_URL}/auth/refresh", headers=refresh_headers)
+    refresh_response = SESSION.post(f"{BASE_URL}/auth/refresh", headers=refresh_headers)
     
     print(f"Status: {refresh_response.status_code}")
     if refresh_response.status_code == 200:
@@ -82,7 +108,7 @@ def test_auth_flow():
     # Step 6: Test logout
     print("\n6. Testing logout...")
     
-    logout_response = requests.post(f"{BASE_URL}/auth/logout", headers=headers)
+    logout_response = SESSION.post(f"{BASE_URL}/auth/logout", headers=headers)
     print(f"Status: {logout_response.status_code}")
     print(f"Response: {json.dumps(logout_response.json(), indent=2)}")
     
@@ -1,14 +1,26 @@
 """
 Test the new user signup flow with face registration
 """
+import os
 import requests
 import json
-import base64
 from pathlib import Path
 import time
 
 BASE_URL = "http://localhost:5001/api"
 
+# Shared session so all calls reuse the same keep-alive connection
+SESSION = requests.Session()
+
+# Pretty-print full response bodies only when VERBOSE=1
+VERBOSE = os.getenv("VERBOSE", "0") == "1"
+
+# Smallest valid image (a 1x1 PNG), for requests that the server rejects before looking at the image
+TINY_IMAGE = (
+    b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x02\x00\x00\x00\x90wS\xde"
+    b"\x00\x00\x00\x0cIDAT\x08\xd7c```\x00\x00\x00\x04\x00\x01'4'\n\x00\x00\x00\x00IEND\xaeB`\x82"
+)
+
 def test_signup_flow():
     """Test the complete signup flow"""
     print("🆕 Testing New User Signup Flow")
@@ -26,19 +38,21 @@ def test_signup_flow():
         print("❌ Test image not found")
         return
     
-    with open(test_image_path, "rb") as f:
-        image_base64 = base64.b64encode(f.read()).decode('utf-8')
+    # The image is uploaded as raw bytes (multipart/form-data), so no base64 encoding is needed
+    image_bytes = test_image_path.read_bytes()
+    image_file = {"image": (test_image_path.name, image_bytes, "image/jpeg")}
     
     # Step 1: Check email availability
     print("\n1. Testing email availability check...")
-    email_check_response = requests.post(
+    email_check_response = SESSION.post(
         f"{BASE_URL}/public/check-email",
         json={"email": test_user["email"]}
     )
     
     print(f"Status: {email_check_response.status_code}")
     email_data = email_check_response.json()
-    print(f"Response: {json.dumps(email_data, indent=2, ensure_ascii=False)}")
+    if VERBOSE:
+        print(f"Response: {json.dumps(email_data, indent=2, ensure_ascii=False)}")
     
     if email_check_response.status_code == 200 and email_data['data']['available']:
         print("✅ Email is available")
@@ -48,19 +62,16 @@ def test_signup_flow():
     
     # Step 2: Register user with face
     print("\n2. Testing user registration with face...")
-    signup_data = {
-        **test_user,
-        "image": image_base64
-    }
-    
-    signup_response = requests.post(
+    signup_response = SESSION.post(
         f"{BASE_URL}/public/register-user-with-face",
-        json=signup_data
+        data=test_user,
+        files=image_file
     )
     
     print(f"Status: {signup_response.status_code}")
     signup_result = signup_response.json()
-    print(f"Response: {json.dumps(signup_result, indent=2, ensure_ascii=False)}")
+    if VERBOSE:
+        print(f"Response: {json.dumps(signup_result, indent=2, ensure_ascii=False)}")
     
     if signup_response.status_code != 201:
         print("❌ User registration failed")
@@ -75,7 +86,7 @@ def test_signup_flow():
     print("\n3. Testing immediate authentication with token...")
     headers = {"Authorization": f"Bearer {access_token}"}
     
-    me_response = requests.get(f"{BASE_URL}/auth/me", headers=headers)
+    me_response = SESSION.get(f"{BASE_URL}/auth/me", headers=headers)
     print(f"Status: {me_response.status_code}")
     if me_response.status_code == 200:
         me_data = me_response.json()
@@ -86,9 +97,9 @@ def test_signup_flow():
     
     # Step 4: Test face authentication
     print("\n4. Testing face authentication...")
-    auth_response = requests.post(
+    auth_response = SESSION.post(
         f"{BASE_URL}/auth/login",
-        json={"image": image_base64}
+        files=image_file
     )
     
     print(f"Status: {auth_response.status_code}")
@@ -103,10 +114,12 @@ def test_signup_flow():
         print("❌ Face authentication failed")
     
     # Step 5: Test duplicate email registration
+    # (the email is checked before the image is decoded, so a tiny image is enough)
     print("\n5. Testing duplicate email registration...")
-    duplicate_response = requests.post(
+    duplicate_response = SESSION.post(
         f"{BASE_URL}/public/register-user-with-face",
-        json=signup_data
+        data=test_user,
+        files={"image": ("tiny.png", TINY_IMAGE, "image/png")}
     )
     
     print(f"Status: {duplicate_response.status_code}")
@@ -117,7 +130,7 @@ def test_signup_flow():
     
     # Step 6: Clean up - delete test user
     print("\n6. Cleaning up test user...")
-    delete_response = requests.delete(
+    delete_response = SESSION.delete(
         f"{BASE_URL}/users/{user_id}",
         headers=headers
     )
@@ -138,12 +151,12 @@ def test_error_cases():
     
     # Test 1: Missing data
     print("\n1. Testing missing data...")
-    response = requests.post(f"{BASE_URL}/public/register-user-with-face", json={})
+    response = SESSION.post(f"{BASE_URL}/public/register-user-with-face", json={})
     print(f"Status: {response.status_code} (Expected: 400)")
     
     # Test 2: Invalid email format
     print("\n2. Testing invalid email...")
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/public/register-user-with-face",
         json={
             "name": "Test User",
@@ -155,7 +168,7 @@ def test_error_cases():
     
     # Test 3: Invalid image data
     print("\n3. Testing invalid image...")
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/public/register-user-with-face",
         json={
             "name": "Test User",
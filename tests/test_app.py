@@ -1,6 +1,7 @@
 """
 Test the Flask application.
 """
+import io
 import os
 import sys
 import unittest
@@ -13,16 +14,18 @@ from app import create_app
 class TestApp(unittest.TestCase):
     """Test the Flask application."""
     
-    def setUp(self):
-        """Set up the test environment."""
-        self.app = create_app({'TESTING': True})
-        self.client = self.app.test_client()
-        self.app_context = self.app.app_context()
-        self.app_context.push()
+    @classmethod
+    def setUpClass(cls):
+        """Set up the test environment once for all tests."""
+        cls.app = create_app({'TESTING': True})
+        cls.client = cls.app.test_client()
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
     
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         """Clean up the test environment."""
-        self.app_context.pop()
+        cls.app_context.pop()
     
     def test_index(self):
         """Test the index route."""
@@ -57,5 +60,62 @@ class TestApp(unittest.TestCase):
         self.assertEqual(json_data['status'], 'success')
         self.assertIn('history', json_data['data'])
 
+    def test_authenticate_multipart_upload(self):
+        """Test that the authenticate endpoint accepts a multipart image upload."""
+        response = self.client.post(
+            '/api/recognition/authenticate',
+            data={'image': (io.BytesIO(b'not an image'), 'face.jpg')},
+            content_type='multipart/form-data'
+        )
+        self.assertEqual(response.status_code, 400)
+        json_data = response.get_json()
+        self.assertEqual(json_data['status'], 'error')
+        self.assertIn('Invalid', json_data['message'])
+
+    def test_login_multipart_upload(self):
+        """Test that the login endpoint accepts a multipart image upload."""
+        response = self.client.post(
+            '/api/auth/login',
+            data={'image': (io.BytesIO(b'not an image'), 'face.jpg')},
+            content_type='multipart/form-data'
+        )
+        self.assertEqual(response.status_code, 400)
+        json_data = response.get_json()
+        self.assertEqual(json_data['status'], 'error')
+        self.assertEqual(json_data['message'], 'Invalid image data')
+
+    def test_register_user_with_face_multipart_upload(self):
+        """Test that public registration reads its fields from a multipart form."""
+        response = self.client.post(
+            '/api/public/register-user-with-face',
+            data={
+                'name': 'Multipart User',
+                'email': 'multipart-upload@example.com',
+                'image': (io.BytesIO(b'not an image'), 'face.jpg')
+            },
+            content_type='multipart/form-data'
+        )
+        self.assertEqual(response.status_code, 400)
+        json_data = response.get_json()
+        self.assertEqual(json_data['status'], 'error')
+        self.assertEqual(json_data['message'], 'Invalid image data')
+
+    def test_multipart_upload_without_image(self):
+        """Test that a multipart request without an image file is rejected with 400, not 415."""
+        cases = [
+            ('/api/auth/login', {}, 'Image data is required'),
+            ('/api/recognition/authenticate', {}, 'image is required'),
+            ('/api/public/register-user-with-face',
+             {'name': 'Multipart User', 'email': 'multipart-upload@example.com'},
+             'Missing required fields: image'),
+        ]
+        for url, form, message in cases:
+            with self.subTest(url=url):
+                response = self.client.post(url, data=form, content_type='multipart/form-data')
+                self.assertEqual(response.status_code, 400)
+                json_data = response.get_json()
+                self.assertEqual(json_data['status'], 'error')
+                self.assertEqual(json_data['message'], message)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -6,6 +6,8 @@ import sys
 import logging
 import sqlite3
 
+import pytest
+
 # Add the parent directory to the path so we can import the app modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -15,12 +17,14 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
-from app.database.db import init_db, test_connection, get_db_connection
+from app.config import DATABASE
+from app.database.db import init_db, get_db_connection
+from app.database.db import test_connection as check_connection  # aliased so pytest does not collect it
 from app.database.models import User, FaceEncoding, AuthLog
 
 logger = logging.getLogger(__name__)
 
-def test_db_initialization():
+def check_db_initialization():
     """Test database initialization."""
     logger.info("Testing database initialization...")
     
@@ -34,12 +38,12 @@ def test_db_initialization():
     
     return result
 
-def test_db_connection():
+def check_db_connection():
     """Test database connection."""
     logger.info("Testing database connection...")
     
     # Test the connection
-    result = test_connection()
+    result = check_connection()
     
     if result:
         logger.info("✅ Database connection test successful")
@@ -48,7 +52,7 @@ def test_db_connection():
     
     return result
 
-def test_table_creation():
+def check_table_creation():
     """Test that tables were created correctly."""
     logger.info("Testing table creation...")
     
@@ -56,35 +60,39 @@ def test_table_creation():
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Check if the tables exist
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [table['name'] for table in cursor.fetchall() if not table['name'].startswith('sqlite_')]
+        # Get every table with its column count in one query (pragma_table_info as a table-valued function)
+        cursor.execute(
+            "SELECT m.name AS name, COUNT(*) AS column_count "
+            "FROM sqlite_master AS m JOIN pragma_table_info(m.name) "
+            "WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%' "
+            "GROUP BY m.name ORDER BY m.rowid"
+        )
+        column_counts = {row['name']: row['column_count'] for row in cursor.fetchall()}
+        tables = list(column_counts)
         
         expected_tables = ['users', 'face_encodings', 'auth_logs']
         missing_tables = [table for table in expected_tables if table not in tables]
         
         if not missing_tables:
-            logger.info(f"✅ All expected tables exist: {', '.join(tables)}")
+            logger.info("✅ All expected tables exist: %s", ', '.join(tables))
             
             # Check table schemas
             for table in expected_tables:
-                cursor.execute(f"PRAGMA table_info({table})")
-                columns = cursor.fetchall()
-                logger.info(f"Table '{table}' has {len(columns)} columns")
+                logger.info("Table '%s' has %d columns", table, column_counts[table])
             
             conn.close()
             return True
         else:
-            logger.error(f"❌ Missing tables: {', '.join(missing_tables)}")
+            logger.error("❌ Missing tables: %s", ', '.join(missing_tables))
             conn.close()
             return False
     except sqlite3.Error as e:
-        logger.error(f"Error testing table creation: {e}")
+        logger.error("Error testing table creation: %s", e)
         if conn:
             conn.close()
         return False
 
-def test_basic_operations():
+def check_basic_operations():
     """Test basic database operations."""
     logger.info("Testing basic database operations...")
     
@@ -96,7 +104,7 @@ def test_basic_operations():
             logger.error("❌ Failed to create test user")
             return False
         
-        logger.info(f"✅ Created test user with ID: {test_user.id}")
+        logger.info("✅ Created test user with ID: %s", test_user.id)
         
         # Retrieve the user by ID
         retrieved_user = User.get_by_id(test_user.id)
@@ -105,7 +113,7 @@ def test_basic_operations():
             logger.error("❌ Failed to retrieve user by ID")
             return False
         
-        logger.info(f"✅ Retrieved user by ID: {retrieved_user.id}, Name: {retrieved_user.name}")
+        logger.info("✅ Retrieved user by ID: %s, Name: %s", retrieved_user.id, retrieved_user.name)
         
         # Update the user
         retrieved_user.name = "Updated Test User"
@@ -117,7 +125,7 @@ def test_basic_operations():
         
         # Verify the update
         updated_user = User.get_by_id(test_user.id)
-        logger.info(f"✅ Updated user name: {updated_user.name}")
+        logger.info("✅ Updated user name: %s", updated_user.name)
         
         # Create an auth log
         auth_log = AuthLog.create(user_id=test_user.id, success=True, confidence=0.95)
@@ -126,7 +134,7 @@ def test_basic_operations():
             logger.error("❌ Failed to create auth log")
             return False
         
-        logger.info(f"✅ Created auth log with ID: {auth_log.id}")
+        logger.info("✅ Created auth log with ID: %s", auth_log.id)
         
         # Retrieve auth logs
         logs = AuthLog.get_by_user_id(test_user.id)
@@ -135,7 +143,7 @@ def test_basic_operations():
             logger.error("❌ Failed to retrieve auth logs")
             return False
         
-        logger.info(f"✅ Retrieved {len(logs)} auth logs")
+        logger.info("✅ Retrieved %d auth logs", len(logs))
         
         # Clean up - delete the test user (should cascade to face_encodings and set auth_logs user_id to NULL)
         delete_result = test_user.delete()
@@ -157,28 +165,56 @@ def test_basic_operations():
         
         return True
     except Exception as e:
-        logger.error(f"Error during basic operations test: {e}")
+        logger.error("Error during basic operations test: %s", e)
         return False
 
+@pytest.fixture
+def isolated_db(tmp_path, monkeypatch):
+    """Point the app at a fresh database file of its own, so tests can run in parallel (pytest -n)."""
+    monkeypatch.setitem(DATABASE, 'path', str(tmp_path / 'face_login.db'))
+    return DATABASE['path']
+
+@pytest.fixture
+def initialized_db(isolated_db):
+    """An isolated database with the tables created."""
+    assert init_db()
+    return isolated_db
+
+def test_db_initialization(isolated_db):
+    """Test database initialization on an empty database."""
+    assert check_db_initialization()
+
+def test_db_connection(initialized_db):
+    """Test database connection."""
+    assert check_db_connection()
+
+def test_table_creation(initialized_db):
+    """Test tables created by init_db."""
+    assert check_table_creation()
+
+def test_basic_operations(initialized_db):
+    """Test create, read, update and delete through the models."""
+    assert check_basic_operations()
+
 def run_tests():
     """Run all database tests."""
     logger.info("Starting database tests...")
     
     # Run the tests
-    init_result = test_db_initialization()
-    conn_result = test_db_connection()
-    table_result = test_table_creation()
-    ops_result = test_basic_operations()
+    init_result = check_db_initialization()
+    conn_result = check_db_connection()
+    table_result = check_table_creation()
+    ops_result = check_basic_operations()
     
     # Print summary
     logger.info("\n--- Test Summary ---")
-    logger.info(f"Database Initialization: {'✅ PASS' if init_result else '❌ FAIL'}")
-    logger.info(f"Database Connection: {'✅ PASS' if conn_result else '❌ FAIL'}")
-    logger.info(f"Table Creation: {'✅ PASS' if table_result else '❌ FAIL'}")
-    logger.info(f"Basic Operations: {'✅ PASS' if ops_result else '❌ FAIL'}")
+    logger.info("Database Initialization: %s", '✅ PASS' if init_result else '❌ FAIL')
+    logger.info("Database Connection: %s", '✅ PASS' if conn_result else '❌ FAIL')
+    logger.info("Table Creation: %s", '✅ PASS' if table_result else '❌ FAIL')
+    logger.info("Basic Operations: %s", '✅ PASS' if ops_result else '❌ FAIL')
     
     all_passed = all([init_result, conn_result, table_result, ops_result])
-    logger.info(f"\nOverall Result: {'✅ ALL TESTS PASSED' if all_passed else '❌ SOME TESTS FAILED'}")
+    logger.info("\nOverall Result: %s", '✅ ALL TESTS PASSED' if all_passed else '❌ SOME TESTS FAILED')
     
     return all_passed
 
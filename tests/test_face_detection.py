@@ -1,49 +1,76 @@
 """
 Tests for the face detection service.
+
+Set FACE_TEST_DUMP_IMAGES=1 to save the synthetic test images to
+tests/test_images for debugging.
 """
 import os
 import sys
 import unittest
+from unittest.mock import patch
 import cv2
 import numpy as np
 
 # Add the parent directory to the path so we can import the app modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-import app.services.face_detection
 from app.services.face_detection import (
     detect_faces,
     detect_single_face,
     validate_face_image,
+    check_image_quality,
     extract_face_encoding,
     FaceDetectionError,
     MultipleFacesError,
     ImageQualityError
 )
 
+# Save the synthetic test images for debugging (set FACE_TEST_DUMP_IMAGES=1 to enable)
+DUMP_IMAGES = os.environ.get('FACE_TEST_DUMP_IMAGES', '0') == '1'
+
 class TestFaceDetection(unittest.TestCase):
     """Test cases for face detection service."""
     
-    def setUp(self):
-        """Set up test fixtures."""
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures once; they are shared by all tests and must not be modified."""
         # Create a simple test image with a face-like pattern
         # This is a very simplified representation and won't work with real face detection
         # but it's useful for testing the error handling
-        self.test_image = np.zeros((300, 300, 3), dtype=np.uint8)
+        cls.test_image = np.zeros((300, 300, 3), dtype=np.uint8)
         # Draw a circle for a face
-        cv2.circle(self.test_image, (150, 150), 60, (255, 255, 255), -1)
+        cv2.circle(cls.test_image, (150, 150), 60, (255, 255, 255), -1)
         # Draw eyes
-        cv2.circle(self.test_image, (130, 130), 10, (0, 0, 0), -1)
-        cv2.circle(self.test_image, (170, 130), 10, (0, 0, 0), -1)
+        cv2.circle(cls.test_image, (130, 130), 10, (0, 0, 0), -1)
+        cv2.circle(cls.test_image, (170, 130), 10, (0, 0, 0), -1)
         # Draw mouth
-        cv2.ellipse(self.test_image, (150, 170), (30, 10), 0, 0, 180, (0, 0, 0), -1)
+        cv2.ellipse(cls.test_image, (150, 170), (30, 10), 0, 0, 180, (0, 0, 0), -1)
         
         # Create an image without a face
-        self.no_face_image = np.zeros((300, 300, 3), dtype=np.uint8)
+        cls.no_face_image = np.zeros((300, 300, 3), dtype=np.uint8)
+        
+        # Create an image with multiple face-like patterns
+        cls.multi_face_image = np.zeros((300, 300, 3), dtype=np.uint8)
+        # Draw first face
+        cv2.circle(cls.multi_face_image, (100, 100), 40, (255, 255, 255), -1)
+        # Draw second face
+        cv2.circle(cls.multi_face_image, (200, 100), 40, (255, 255, 255), -1)
+        
+        # Create a dark image with a very dim face-like pattern
+        cls.dark_image = np.zeros((200, 200, 3), dtype=np.uint8)
+        cv2.circle(cls.dark_image, (100, 100), 40, (20, 20, 20), -1)
+        
+        # Create a bright image
+        cls.bright_image = np.full((200, 200, 3), 250, dtype=np.uint8)
+        
+        # Create an image of normal brightness with no face
+        cls.no_face_bright_image = np.full((200, 200, 3), 150, dtype=np.uint8)
         
         # Save the test images for debugging
-        cv2.imwrite('tests/test_images/test_face.jpg', self.test_image)
-        cv2.imwrite('tests/test_images/no_face.jpg', self.no_face_image)
+        if DUMP_IMAGES:
+            cv2.imwrite('tests/test_images/test_face.jpg', cls.test_image)
+            cv2.imwrite('tests/test_images/no_face.jpg', cls.no_face_image)
+            cv2.imwrite('tests/test_images/multi_face.jpg', cls.multi_face_image)
     
     def test_detect_faces_invalid_input(self):
         """Test detect_faces with invalid input."""
@@ -61,66 +88,43 @@ class TestFaceDetection(unittest.TestCase):
         with self.assertRaises(FaceDetectionError):
             detect_faces(self.no_face_image)
     
-    def test_detect_faces_with_face(self):
+    @patch('app.services.face_detection.face_recognition.face_locations')
+    def test_detect_faces_with_face(self, mock_face_locations):
         """
         Test detect_faces with an image that has a face.
         
-        Note: This test might fail with the synthetic image we created,
-        as it's not a real face. In a real-world scenario, you would use
-        actual face images for testing.
+        The synthetic image is not a real face, so face_recognition is mocked
+        to report one face (the no-face test covers the real detector).
         """
-        try:
-            face_locations = detect_faces(self.test_image)
-            # If we get here, the function detected a face in our synthetic image
-            # This is unlikely with real face detection algorithms, but we'll check anyway
-            self.assertIsInstance(face_locations, list)
-            self.assertTrue(len(face_locations) > 0)
-            for face_location in face_locations:
-                self.assertEqual(len(face_location), 4)  # (top, right, bottom, left)
-        except FaceDetectionError:
-            # This is the expected outcome with our synthetic image
-            # We'll skip this test in this case
-            self.skipTest("No face detected in synthetic image, which is expected")
+        mock_face_locations.return_value = [(90, 210, 210, 90)]
+        
+        face_locations = detect_faces(self.test_image)
+        
+        mock_face_locations.assert_called_once()
+        self.assertIsInstance(face_locations, list)
+        self.assertTrue(len(face_locations) > 0)
+        for face_location in face_locations:
+            self.assertEqual(len(face_location), 4)  # (top, right, bottom, left)
     
-    def test_detect_single_face(self):
+    @patch('app.services.face_detection.face_recognition.face_locations')
+    def test_detect_single_face(self, mock_face_locations):
         """Test detect_single_face with an image that has a single face."""
-        try:
-            face_location = detect_single_face(self.test_image)
-            # If we get here, the function detected a face in our synthetic image
-            self.assertIsInstance(face_location, tuple)
-            self.assertEqual(len(face_location), 4)  # (top, right, bottom, left)
-        except FaceDetectionError:
-            # This is the expected outcome with our synthetic image
-            self.skipTest("No face detected in synthetic image, which is expected")
+        # The synthetic image is not a real face, so mock face_recognition to report one face
+        mock_face_locations.return_value = [(90, 210, 210, 90)]
+        
+        face_location = detect_single_face(self.test_image)
+        
+        self.assertIsInstance(face_location, tuple)
+        self.assertEqual(len(face_location), 4)  # (top, right, bottom, left)
     
     def test_detect_single_face_multiple_faces(self):
         """Test detect_single_face with an image that has multiple faces."""
-        # Create an image with multiple face-like patterns
-        multi_face_image = np.zeros((300, 300, 3), dtype=np.uint8)
-        # Draw first face
-        cv2.circle(multi_face_image, (100, 100), 40, (255, 255, 255), -1)
-        # Draw second face
-        cv2.circle(multi_face_image, (200, 100), 40, (255, 255, 255), -1)
-        
-        # Save the test image for debugging
-        cv2.imwrite('tests/test_images/multi_face.jpg', multi_face_image)
-        
         # Mock the detect_faces function to return multiple face locations
-        original_detect_faces = app.services.face_detection.detect_faces
-        
-        def mock_detect_faces(image):
-            return [(10, 50, 50, 10), (60, 100, 100, 60)]
-        
-        try:
-            # Replace the original function with our mock
-            app.services.face_detection.detect_faces = mock_detect_faces
-            
+        with patch('app.services.face_detection.detect_faces',
+                   return_value=[(10, 50, 50, 10), (60, 100, 100, 60)]):
             # Test that MultipleFacesError is raised
             with self.assertRaises(MultipleFacesError):
-                detect_single_face(multi_face_image)
-        finally:
-            # Restore the original function
-            app.services.face_detection.detect_faces = original_detect_faces
+                detect_single_face(self.multi_face_image)
 
     def test_validate_face_image_invalid_input(self):
         """Test validate_face_image with invalid input."""
@@ -146,13 +150,8 @@ class TestFaceDetection(unittest.TestCase):
     
     def test_validate_face_image_dark_image(self):
         """Test validate_face_image with a dark image."""
-        # Create a dark image
-        dark_image = np.zeros((200, 200, 3), dtype=np.uint8)
-        # Add a very dim face-like pattern
-        cv2.circle(dark_image, (100, 100), 40, (20, 20, 20), -1)
-        
         # Validate the image
-        is_valid, message = validate_face_image(dark_image)
+        is_valid, message = validate_face_image(self.dark_image)
         
         # Check the result
         self.assertFalse(is_valid)
@@ -160,23 +159,29 @@ class TestFaceDetection(unittest.TestCase):
     
     def test_validate_face_image_bright_image(self):
         """Test validate_face_image with a bright image."""
-        # Create a bright image
-        bright_image = np.ones((200, 200, 3), dtype=np.uint8) * 250
-        
         # Validate the image
-        is_valid, message = validate_face_image(bright_image)
+        is_valid, message = validate_face_image(self.bright_image)
         
         # Check the result
         self.assertFalse(is_valid)
         self.assertIn("too bright", message)
     
+    def test_check_image_quality(self):
+        """Test check_image_quality reports size and brightness problems without detecting faces."""
+        with patch('app.services.face_detection.detect_faces') as mock_detect_faces:
+            is_valid, message = check_image_quality(self.dark_image)
+            self.assertFalse(is_valid)
+            self.assertIn("too dark", message)
+            
+            is_valid, message = check_image_quality(self.no_face_bright_image)
+            self.assertTrue(is_valid)
+            
+            mock_detect_faces.assert_not_called()
+    
     def test_validate_face_image_no_face(self):
         """Test validate_face_image with an image that has no face."""
-        # Create a brighter image with no face
-        no_face_bright = np.ones((200, 200, 3), dtype=np.uint8) * 150
-        
         # Validate the image
-        is_valid, message = validate_face_image(no_face_bright)
+        is_valid, message = validate_face_image(self.no_face_bright_image)
         
         # Check the result
         self.assertFalse(is_valid)
@@ -217,80 +222,34 @@ class TestFaceDetection(unittest.TestCase):
     
     def test_extract_face_encoding_no_face(self):
         """Test extract_face_encoding with an image that has no face."""
-        # Create a brighter image with no face
-        no_face_bright = np.ones((200, 200, 3), dtype=np.uint8) * 150
-        
         # Test that FaceDetectionError is raised
         with self.assertRaises(FaceDetectionError):
-            extract_face_encoding(no_face_bright)
+            extract_face_encoding(self.no_face_bright_image)
     
     def test_extract_face_encoding_multiple_faces(self):
         """Test extract_face_encoding with an image that has multiple faces."""
-        # Create an image with multiple face-like patterns
-        multi_face_image = np.zeros((300, 300, 3), dtype=np.uint8)
-        # Draw first face
-        cv2.circle(multi_face_image, (100, 100), 40, (255, 255, 255), -1)
-        # Draw second face
-        cv2.circle(multi_face_image, (200, 100), 40, (255, 255, 255), -1)
-        
         # Mock the validate_face_image function to return False with multiple faces message
-        original_validate = app.services.face_detection.validate_face_image
-        
-        def mock_validate(image):
-            return False, "Multiple faces detected in the image: 2"
-        
-        try:
-            # Replace the original function with our mock
-            app.services.face_detection.validate_face_image = mock_validate
-            
+        with patch('app.services.face_detection.validate_face_image',
+                   return_value=(False, "Multiple faces detected in the image: 2")):
             # Test that MultipleFacesError is raised
             with self.assertRaises(MultipleFacesError):
-                extract_face_encoding(multi_face_image)
-        finally:
-            # Restore the original function
-            app.services.face_detection.validate_face_image = original_validate
+                extract_face_encoding(self.multi_face_image)
     
-    def test_extract_face_encoding_valid(self):
-        """
-        Test extract_face_encoding with a valid image.
-        
-        Note: This test might be skipped with the synthetic image we created,
-        as it's not a real face. In a real-world scenario, you would use
-        actual face images for testing.
-        """
-        try:
-            # Mock the validate_face_image function to return True
-            original_validate = app.services.face_detection.validate_face_image
-            original_face_locations = face_recognition.face_locations
-            original_face_encodings = face_recognition.face_encodings
-            
-            def mock_validate(image):
-                return True, "Image is valid for face recognition"
-            
-            def mock_face_locations(image):
-                return [(50, 150, 150, 50)]  # Fake face location
-            
-            def mock_face_encodings(image, face_locations):
-                return [np.zeros(128)]  # Fake 128-dimensional encoding
-            
-            try:
-                # Replace the original functions with our mocks
-                app.services.face_detection.validate_face_image = mock_validate
-                face_recognition.face_locations = mock_face_locations
-                face_recognition.face_encodings = mock_face_encodings
-                
-                # Test that a face encoding is returned
-                encoding = extract_face_encoding(self.test_image)
-                self.assertIsInstance(encoding, np.ndarray)
-                self.assertEqual(encoding.shape[0], 128)  # face_recognition returns 128-dimensional encodings
-            finally:
-                # Restore the original functions
-                app.services.face_detection.validate_face_image = original_validate
-                face_recognition.face_locations = original_face_locations
-                face_recognition.face_encodings = original_face_encodings
-        except Exception as e:
-            # If an exception is raised, skip the test
-            self.skipTest(f"Exception during face encoding extraction: {e}")
+    @patch('app.services.face_detection.face_recognition.face_encodings')
+    @patch('app.services.face_detection.face_recognition.face_locations')
+    @patch('app.services.face_detection.validate_face_image')
+    def test_extract_face_encoding_valid(self, mock_validate, mock_face_locations, mock_face_encodings):
+        """Test extract_face_encoding with a valid image."""
+        # Mock validation, detection and encoding of a single face
+        mock_validate.return_value = (True, "Image is valid for face recognition")
+        mock_face_locations.return_value = [(50, 150, 150, 50)]  # Fake face location
+        mock_face_encodings.return_value = [np.zeros(128)]  # Fake 128-dimensional encoding
+        
+        # Test that a face encoding is returned
+        encoding = extract_face_encoding(self.test_image)
+        self.assertIsInstance(encoding, np.ndarray)
+        self.assertEqual(encoding.shape[0], 128)  # face_recognition returns 128-dimensional encodings
+        mock_face_encodings.assert_called_once()
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -5,13 +5,14 @@ import os
 import sys
 import unittest
 import numpy as np
-from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
+from unittest.mock import patch
 
 # Add the parent directory to the path so we can import the app modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from app.services.face_recognition import (
     get_user_encodings, compare_faces, get_recognition_threshold,
-    register_face, authenticate_face
+    register_face, authenticate_face, get_known_encodings, invalidate_encoding_cache
 )
 from app.services.face_detection import FaceDetectionError, MultipleFacesError, ImageQualityError
 from app.database.models import User, FaceEncoding
@@ -19,20 +20,28 @@ from app.database.models import User, FaceEncoding
 class TestFaceRecognitionService(unittest.TestCase):
     """Test cases for the face recognition service."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures once; they are shared by all tests and must not be modified."""
+        # Fake face encodings
+        cls.encoding_a = np.array([0.1, 0.2, 0.3])
+        cls.encoding_b = np.array([0.4, 0.5, 0.6])
+        cls.encoding_c = np.array([0.7, 0.8, 0.9])
+        
+        # Dummy image
+        cls.image = np.zeros((100, 100, 3), dtype=np.uint8)
+
     @patch('app.services.face_recognition.User.get_by_id')
     @patch('app.services.face_recognition.FaceEncoding.get_by_user_id')
     def test_get_user_encodings_success(self, mock_get_by_user_id, mock_get_by_id):
         """Test successful retrieval of user encodings."""
         # Mock user
-        mock_user = MagicMock()
-        mock_user.id = 1
+        mock_user = SimpleNamespace(id=1)
         mock_get_by_id.return_value = mock_user
         
         # Mock face encodings
-        mock_encoding1 = MagicMock()
-        mock_encoding1.encoding = [0.1, 0.2, 0.3]
-        mock_encoding2 = MagicMock()
-        mock_encoding2.encoding = [0.4, 0.5, 0.6]
+        mock_encoding1 = SimpleNamespace(encoding=[0.1, 0.2, 0.3])
+        mock_encoding2 = SimpleNamespace(encoding=[0.4, 0.5, 0.6])
         mock_get_by_user_id.return_value = [mock_encoding1, mock_encoding2]
         
         # Call the function
@@ -63,8 +72,7 @@ class TestFaceRecognitionService(unittest.TestCase):
     def test_get_user_encodings_no_encodings(self, mock_get_by_user_id, mock_get_by_id):
         """Test get_user_encodings when no encodings are found."""
         # Mock user
-        mock_user = MagicMock()
-        mock_user.id = 1
+        mock_user = SimpleNamespace(id=1)
         mock_get_by_id.return_value = mock_user
         
         # Mock no face encodings found
@@ -90,59 +98,83 @@ class TestFaceRecognitionService(unittest.TestCase):
             get_user_encodings("invalid")
         self.assertIn("Invalid user_id", str(context.exception))
     
-    @patch('app.services.face_recognition.face_recognition.compare_faces')
-    @patch('app.services.face_recognition.face_recognition.face_distance')
-    def test_compare_faces_match(self, mock_face_distance, mock_compare_faces):
-        """Test compare_faces when there is a match."""
-        # Mock data
-        known_encodings = [np.array([0.1, 0.2, 0.3]), np.array([0.4, 0.5, 0.6])]
-        face_encoding = np.array([0.1, 0.2, 0.3])
-        
-        # Mock face_recognition.compare_faces to return a match
-        mock_compare_faces.return_value = [True, False]
-        
-        # Mock face_recognition.face_distance to return distances
-        mock_face_distance.return_value = np.array([0.1, 0.8])
-        
-        # Call the function
-        match_found, best_match_index, confidence = compare_faces(known_encodings, face_encoding)
+    @patch('app.services.face_recognition.FaceEncoding.get_all')
+    def test_get_known_encodings_cached(self, mock_get_all):
+        """Test that known encodings are loaded once and cached until invalidated."""
+        # Mock face encodings for two users
+        mock_encoding1 = SimpleNamespace(user_id=1, encoding=[0.1] * 128)
+        mock_encoding2 = SimpleNamespace(user_id=2, encoding=[0.2] * 128)
+        mock_get_all.return_value = [mock_encoding1, mock_encoding2]
+        
+        invalidate_encoding_cache()
+        try:
+            # Call the function twice
+            encodings, user_ids = get_known_encodings()
+            get_known_encodings()
+            
+            # Assertions
+            mock_get_all.assert_called_once()
+            self.assertEqual(encodings.shape, (2, 128))
+            self.assertEqual(encodings.dtype, np.float32)
+            self.assertEqual(user_ids.tolist(), [1, 2])
+            
+            # Invalidating forces a reload
+            invalidate_encoding_cache()
+            get_known_encodings()
+            self.assertEqual(mock_get_all.call_count, 2)
+        finally:
+            invalidate_encoding_cache()
+    
+    @patch('app.services.face_recognition.FaceEncoding.get_all')
+    def test_get_known_encodings_empty(self, mock_get_all):
+        """Test get_known_encodings when no encodings are registered."""
+        mock_get_all.return_value = []
         
-        # Assertions
-        mock_compare_faces.assert_called_once()
-        mock_face_distance.assert_called_once()
-        self.assertTrue(match_found)
-        self.assertEqual(best_match_index, 0)
-        self.assertAlmostEqual(confidence, 0.9, places=1)
+        invalidate_encoding_cache()
+        try:
+            encodings, user_ids = get_known_encodings()
+            
+            self.assertEqual(encodings.shape, (0, 128))
+            self.assertEqual(len(user_ids), 0)
+        finally:
+            invalidate_encoding_cache()
     
     @patch('app.services.face_recognition.face_recognition.compare_faces')
     @patch('app.services.face_recognition.face_recognition.face_distance')
-    def test_compare_faces_no_match(self, mock_face_distance, mock_compare_faces):
-        """Test compare_faces when there is no match."""
-        # Mock data
-        known_encodings = [np.array([0.1, 0.2, 0.3]), np.array([0.4, 0.5, 0.6])]
-        face_encoding = np.array([0.7, 0.8, 0.9])
-        
-        # Mock face_recognition.compare_faces to return no match
-        mock_compare_faces.return_value = [False, False]
-        
-        # Mock face_recognition.face_distance to return distances
-        mock_face_distance.return_value = np.array([0.7, 0.6])
-        
-        # Call the function
-        match_found, best_match_index, confidence = compare_faces(known_encodings, face_encoding)
-        
-        # Assertions
-        mock_compare_faces.assert_called_once()
-        mock_face_distance.assert_called_once()
-        self.assertFalse(match_found)
-        self.assertEqual(best_match_index, 1)  # Second encoding is closer but still not a match
-        self.assertAlmostEqual(confidence, 0.4, places=1)
+    def test_compare_faces_match_and_no_match(self, mock_face_distance, mock_compare_faces):
+        """Test compare_faces when there is a match and when there is none."""
+        known_encodings = [self.encoding_a, self.encoding_b]
+        # (case, face encoding, compare_faces result, distances, expected match, best index, confidence)
+        cases = [
+            ('match', self.encoding_a, [True, False], [0.1, 0.8], True, 0, 0.9),
+            # Second encoding is closer but still not a match
+            ('no match', self.encoding_c, [False, False], [0.7, 0.6], False, 1, 0.4),
+        ]
+        
+        for case, face_encoding, compare_result, distances, expected_match, expected_index, expected_confidence in cases:
+            with self.subTest(case=case):
+                mock_compare_faces.reset_mock()
+                mock_face_distance.reset_mock()
+                
+                # Mock face_recognition.compare_faces and face_recognition.face_distance
+                mock_compare_faces.return_value = compare_result
+                mock_face_distance.return_value = np.array(distances)
+                
+                # Call the function
+                match_found, best_match_index, confidence = compare_faces(known_encodings, face_encoding)
+                
+                # Assertions
+                mock_compare_faces.assert_called_once()
+                mock_face_distance.assert_called_once()
+                self.assertEqual(match_found, expected_match)
+                self.assertEqual(best_match_index, expected_index)
+                self.assertAlmostEqual(confidence, expected_confidence, places=1)
     
     def test_compare_faces_empty_known_encodings(self):
         """Test compare_faces with empty known_encodings."""
         # Call the function with empty known_encodings
         with self.assertRaises(ValueError) as context:
-            compare_faces([], np.array([0.1, 0.2, 0.3]))
+            compare_faces([], self.encoding_a)
         
         self.assertIn("Invalid known_encodings", str(context.exception))
     
@@ -150,7 +182,7 @@ class TestFaceRecognitionService(unittest.TestCase):
         """Test compare_faces with invalid face_encoding."""
         # Call the function with invalid face_encoding
         with self.assertRaises(ValueError) as context:
-            compare_faces([np.array([0.1, 0.2, 0.3])], None)
+            compare_faces([self.encoding_a], None)
         
         self.assertIn("Invalid face_encoding", str(context.exception))
     
@@ -169,8 +201,8 @@ class TestFaceRecognitionService(unittest.TestCase):
     def test_compare_faces_with_default_threshold(self, mock_face_distance, mock_compare_faces, mock_get_threshold):
         """Test compare_faces using the default threshold from config."""
         # Mock data
-        known_encodings = [np.array([0.1, 0.2, 0.3])]
-        face_encoding = np.array([0.1, 0.2, 0.3])
+        known_encodings = [self.encoding_a]
+        face_encoding = self.encoding_a
         
         # Mock get_recognition_threshold to return a specific value
         mock_get_threshold.return_value = 0.5
@@ -193,33 +225,30 @@ class TestFaceRecognitionService(unittest.TestCase):
     @patch('app.services.face_recognition.cv2.imwrite')
     @patch('app.services.face_recognition.os.makedirs')
     @patch('app.services.face_recognition.FaceEncoding.create')
-    def test_register_face_success(self, mock_create, mock_makedirs, mock_imwrite,
+    @patch('app.services.face_recognition.invalidate_encoding_cache')
+    def test_register_face_success(self, mock_invalidate, mock_create, mock_makedirs, mock_imwrite,
                                   mock_extract_encoding, mock_count, mock_get_by_id):
         """Test successful face registration."""
         # Mock user
-        mock_user = MagicMock()
-        mock_user.id = 1
+        mock_user = SimpleNamespace(id=1)
         mock_get_by_id.return_value = mock_user
         
         # Mock face count
         mock_count.return_value = 2  # User has 2 faces registered, max is 5
         
         # Mock face encoding extraction
-        mock_encoding = np.array([0.1, 0.2, 0.3])
+        mock_encoding = self.encoding_a
         mock_extract_encoding.return_value = mock_encoding
         
         # Mock image save
         mock_imwrite.return_value = True
         
         # Mock face encoding creation
-        mock_face_encoding = MagicMock()
-        mock_face_encoding.id = 1
-        mock_face_encoding.user_id = 1
-        mock_face_encoding.encoding = [0.1, 0.2, 0.3]
+        mock_face_encoding = SimpleNamespace(id=1, user_id=1, encoding=[0.1, 0.2, 0.3])
         mock_create.return_value = mock_face_encoding
         
         # Call the function
-        image = np.zeros((100, 100, 3), dtype=np.uint8)  # Dummy image
+        image = self.image
         result = register_face(1, image)
         
         # Assertions
@@ -229,6 +258,7 @@ class TestFaceRecognitionService(unittest.TestCase):
         mock_makedirs.assert_called_once()
         mock_imwrite.assert_called_once()
         mock_create.assert_called_once()
+        mock_invalidate.assert_called_once()
         self.assertEqual(result, mock_face_encoding)
     
     @patch('app.services.face_recognition.User.get_by_id')
@@ -238,7 +268,7 @@ class TestFaceRecognitionService(unittest.TestCase):
         mock_get_by_id.return_value = None
         
         # Call the function and check for exception
-        image = np.zeros((100, 100, 3), dtype=np.uint8)  # Dummy image
+        image = self.image
         with self.assertRaises(ValueError) as context:
             register_face(999, image)
         
@@ -251,15 +281,14 @@ class TestFaceRecognitionService(unittest.TestCase):
     def test_register_face_max_faces_reached(self, mock_count, mock_get_by_id):
         """Test register_face when max faces limit is reached."""
         # Mock user
-        mock_user = MagicMock()
-        mock_user.id = 1
+        mock_user = SimpleNamespace(id=1)
         mock_get_by_id.return_value = mock_user
         
         # Mock face count at maximum
         mock_count.return_value = 5  # User has 5 faces registered, max is 5
         
         # Call the function and check for exception
-        image = np.zeros((100, 100, 3), dtype=np.uint8)  # Dummy image
+        image = self.image
         with self.assertRaises(ValueError) as context:
             register_face(1, image)
         
@@ -273,8 +302,7 @@ class TestFaceRecognitionService(unittest.TestCase):
     def test_register_face_detection_error(self, mock_extract_encoding, mock_count, mock_get_by_id):
         """Test register_face when face detection fails."""
         # Mock user
-        mock_user = MagicMock()
-        mock_user.id = 1
+        mock_user = SimpleNamespace(id=1)
         mock_get_by_id.return_value = mock_user
         
         # Mock face count
@@ -284,7 +312,7 @@ class TestFaceRecognitionService(unittest.TestCase):
         mock_extract_encoding.side_effect = FaceDetectionError("No faces detected")
         
         # Call the function and check for exception
-        image = np.zeros((100, 100, 3), dtype=np.uint8)  # Dummy image
+        image = self.image
         with self.assertRaises(FaceDetectionError) as context:
             register_face(1, image)
         
@@ -302,29 +330,27 @@ class TestFaceRecognitionService(unittest.TestCase):
                                       mock_get_encodings, mock_get_all, mock_extract_encoding):
         """Test successful face authentication."""
         # Mock face encoding extraction
-        mock_encoding = np.array([0.1, 0.2, 0.3])
+        mock_encoding = self.encoding_a
         mock_extract_encoding.return_value = mock_encoding
         
         # Mock users
-        mock_user1 = MagicMock()
-        mock_user1.id = 1
-        mock_user2 = MagicMock()
-        mock_user2.id = 2
+        mock_user1 = SimpleNamespace(id=1)
+        mock_user2 = SimpleNamespace(id=2)
         mock_get_all.return_value = [mock_user1, mock_user2]
         
         # Mock user encodings
-        mock_get_encodings.side_effect = lambda user_id: [np.array([0.1, 0.2, 0.3])] if user_id == 1 else []
+        mock_get_encodings.side_effect = lambda user_id: [self.encoding_a] if user_id == 1 else []
         
         # Mock face comparison - match with user 1
         def mock_compare_side_effect(encodings, encoding, tolerance):
-            if len(encodings) > 0 and np.array_equal(encodings[0], np.array([0.1, 0.2, 0.3])):
+            if len(encodings) > 0 and np.array_equal(encodings[0], self.encoding_a):
                 return (True, 0, 0.9)
             return (False, -1, 0.0)
         
         mock_compare_faces.side_effect = mock_compare_side_effect
         
         # Call the function
-        image = np.zeros((100, 100, 3), dtype=np.uint8)  # Dummy image
+        image = self.image
         success, user_id, confidence = authenticate_face(image)
         
         # Assertions
@@ -346,22 +372,21 @@ class TestFaceRecognitionService(unittest.TestCase):
                                        mock_get_encodings, mock_get_all, mock_extract_encoding):
         """Test face authentication with no matching user."""
         # Mock face encoding extraction
-        mock_encoding = np.array([0.7, 0.8, 0.9])
+        mock_encoding = self.encoding_c
         mock_extract_encoding.return_value = mock_encoding
         
         # Mock users
-        mock_user1 = MagicMock()
-        mock_user1.id = 1
+        mock_user1 = SimpleNamespace(id=1)
         mock_get_all.return_value = [mock_user1]
         
         # Mock user encodings
-        mock_get_encodings.return_value = [np.array([0.1, 0.2, 0.3])]
+        mock_get_encodings.return_value = [self.encoding_a]
         
         # Mock face comparison - no match
         mock_compare_faces.return_value = (False, -1, 0.3)
         
         # Call the function
-        image = np.zeros((100, 100, 3), dtype=np.uint8)  # Dummy image
+        image = self.image
         success, user_id, confidence = authenticate_face(image)
         
         # Assertions
@@ -379,14 +404,14 @@ class TestFaceRecognitionService(unittest.TestCase):
     def test_authenticate_face_no_users(self, mock_get_all, mock_extract_encoding):
         """Test face authentication when no users exist."""
         # Mock face encoding extraction
-        mock_encoding = np.array([0.1, 0.2, 0.3])
+        mock_encoding = self.encoding_a
         mock_extract_encoding.return_value = mock_encoding
         
         # Mock no users
         mock_get_all.return_value = []
         
         # Call the function
-        image = np.zeros((100, 100, 3), dtype=np.uint8)  # Dummy image
+        image = self.image
         success, user_id, confidence = authenticate_face(image)
         
         # Assertions
@@ -403,7 +428,7 @@ class TestFaceRecognitionService(unittest.TestCase):
         mock_extract_encoding.side_effect = FaceDetectionError("No faces detected")
         
         # Call the function and check for exception
-        image = np.zeros((100, 100, 3), dtype=np.uint8)  # Dummy image
+        image = self.image
         with self.assertRaises(FaceDetectionError) as context:
             authenticate_face(image)
         